@@ -17,9 +17,9 @@ that generates no meaningful responses to the input signal.
 
 import argparse
 import itertools
-import random
 
 import networkx as nx
+import numpy as np
 
 from neurokernel.tools.logging import setup_logger
 import neurokernel.core_gpu as core
@@ -31,6 +31,15 @@ from neurokernel.LPU.LPU import LPU
 from neurokernel.LPU.InputProcessors.FileInputProcessor import FileInputProcessor
 from neurokernel.LPU.OutputProcessors.FileOutputProcessor import FileOutputProcessor
 
+def ids_to_selector(ids):
+    """
+    Create a selector from a sequence of port identifiers of the form
+    '/lpu/out/spk/0' without joining and re-parsing them as one string.
+    """
+
+    return plsel.Selector([tuple(int(t) if t.isdigit() else t
+                                 for t in i.split('/')[1:]) for i in ids])
+
 def main():
 
     def run(connected):
@@ -48,10 +57,12 @@ def main():
         comp_dict_0, conns_0 = LPU.lpu_parser(lpu_file_0)
         comp_dict_1, conns_1 = LPU.lpu_parser(lpu_file_1)
         
-        fl_input_processor_0 = FileInputProcessor('./data/generic_lpu_0_input.h5')
+        fl_input_processor_0 = FileInputProcessor('./data/generic_lpu_0_input.h5',
+                                                  pinned=True)
         fl_output_processor_0 = FileOutputProcessor(
                     [('V',None),('spike_state',None)],
-                    'generic_lpu_0_%s_output.h5' % out_name, sample_interval=1)
+                    'generic_lpu_0_%s_output.h5' % out_name, sample_interval=1,
+                    pinned=True)
 
         lpu_0_id = 'lpu_0'
         man.add(LPU, lpu_0_id, dt, comp_dict_0, conns_0,
@@ -60,10 +71,12 @@ def main():
                     device=args.gpu_dev[0],
                     debug=args.debug, time_sync=args.time_sync)
 
-        fl_input_processor_1 = FileInputProcessor('./data/generic_lpu_1_input.h5')
+        fl_input_processor_1 = FileInputProcessor('./data/generic_lpu_1_input.h5',
+                                                  pinned=True)
         fl_output_processor_1 = FileOutputProcessor(
                     [('V',None),('spike_state',None)],
-                    'generic_lpu_1_%s_output.h5' % out_name, sample_interval=1)
+                    'generic_lpu_1_%s_output.h5' % out_name, sample_interval=1,
+                    pinned=True)
                     
         lpu_1_id = 'lpu_1'
         man.add(LPU, lpu_1_id, dt, comp_dict_1, conns_1,
@@ -77,25 +90,25 @@ def main():
         if connected:
 
             # Find all output and input port selectors in each LPU:
-            out_ports_spk_0 = plsel.Selector(
-                            ','.join(LPU.extract_out_spk(comp_dict_0, 'id')[0]))
-            out_ports_gpot_0 = plsel.Selector(
-                            ','.join(LPU.extract_out_gpot(comp_dict_0, 'id')[0]))
-
-            out_ports_spk_1 = plsel.Selector(
-                            ','.join(LPU.extract_out_spk(comp_dict_1, 'id')[0]))
-            out_ports_gpot_1 = plsel.Selector(
-                            ','.join(LPU.extract_out_gpot(comp_dict_1, 'id')[0]))
-
-            in_ports_spk_0 = plsel.Selector(
-                            ','.join(LPU.extract_in_spk(comp_dict_0, 'id')[0]))
-            in_ports_gpot_0 = plsel.Selector(
-                            ','.join(LPU.extract_in_gpot(comp_dict_0, 'id')[0]))
-
-            in_ports_spk_1 = plsel.Selector(
-                            ','.join(LPU.extract_in_spk(comp_dict_1, 'id')[0]))
-            in_ports_gpot_1 = plsel.Selector(
-                            ','.join(LPU.extract_in_gpot(comp_dict_1, 'id')[0]))
+            out_ports_spk_0 = ids_to_selector(
+                            LPU.extract_out_spk(comp_dict_0, 'id')[0])
+            out_ports_gpot_0 = ids_to_selector(
+                            LPU.extract_out_gpot(comp_dict_0, 'id')[0])
+
+            out_ports_spk_1 = ids_to_selector(
+                            LPU.extract_out_spk(comp_dict_1, 'id')[0])
+            out_ports_gpot_1 = ids_to_selector(
+                            LPU.extract_out_gpot(comp_dict_1, 'id')[0])
+
+            in_ports_spk_0 = ids_to_selector(
+                            LPU.extract_in_spk(comp_dict_0, 'id')[0])
+            in_ports_gpot_0 = ids_to_selector(
+                            LPU.extract_in_gpot(comp_dict_0, 'id')[0])
+
+            in_ports_spk_1 = ids_to_selector(
+                            LPU.extract_in_spk(comp_dict_1, 'id')[0])
+            in_ports_gpot_1 = ids_to_selector(
+                            LPU.extract_in_gpot(comp_dict_1, 'id')[0])
 
             out_ports_0 = plsel.Selector.union(out_ports_spk_0, out_ports_gpot_0)
             out_ports_1 = plsel.Selector.union(out_ports_spk_1, out_ports_gpot_1)
@@ -103,30 +116,30 @@ def main():
             in_ports_0 = plsel.Selector.union(in_ports_spk_0, in_ports_gpot_0)
             in_ports_1 = plsel.Selector.union(in_ports_spk_1, in_ports_gpot_1)
 
-            # Initialize a connectivity pattern between the two sets of port
-            # selectors:
-            pat = pattern.Pattern(plsel.Selector.union(out_ports_0, in_ports_0),
-                                  plsel.Selector.union(out_ports_1, in_ports_1))
+            # Randomly pair the output ports of one LPU with the input ports
+            # of the other LPU; the sampled identifiers are kept as token
+            # tuples so that they need not be parsed again:
+            def sample(sel, n):
+                ids = sel.expanded
+                return [ids[i] for i in rng.choice(len(ids), n, replace=False)]
 
-            # Create connections from the ports with identifiers matching the output
-            # ports of one LPU to the ports with identifiers matching the input
-            # ports of the other LPU:
             N_conn_spk_0_1 = min(len(out_ports_spk_0), len(in_ports_spk_1))
             N_conn_gpot_0_1 = min(len(out_ports_gpot_0), len(in_ports_gpot_1))
-            for src, dest in zip(random.sample(out_ports_spk_0.identifiers,
-                                               N_conn_spk_0_1),
-                                 random.sample(in_ports_spk_1.identifiers,
-                                               N_conn_spk_0_1)):
-                pat[src, dest] = 1
-                pat.interface[src, 'type'] = 'spike'
-                pat.interface[dest, 'type'] = 'spike'
-            for src, dest in zip(random.sample(out_ports_gpot_0.identifiers,
-                                               N_conn_gpot_0_1),
-                                 random.sample(in_ports_gpot_1.identifiers,
-                                               N_conn_gpot_0_1)):
-                pat[src, dest] = 1
-                pat.interface[src, 'type'] = 'gpot'
-                pat.interface[dest, 'type'] = 'gpot'
+            src_spk = sample(out_ports_spk_0, N_conn_spk_0_1)
+            dest_spk = sample(in_ports_spk_1, N_conn_spk_0_1)
+            src_gpot = sample(out_ports_gpot_0, N_conn_gpot_0_1)
+            dest_gpot = sample(in_ports_gpot_1, N_conn_gpot_0_1)
+
+            # Create the connectivity pattern between the two sets of port
+            # selectors with all connections and port types set at once:
+            pat = pattern.Pattern.from_concat(
+                plsel.Selector.union(out_ports_0, in_ports_0),
+                plsel.Selector.union(out_ports_1, in_ports_1),
+                from_sel=plsel.Selector(src_spk+src_gpot),
+                to_sel=plsel.Selector(dest_spk+dest_gpot),
+                spike_sel=plsel.Selector(src_spk+dest_spk),
+                gpot_sel=plsel.Selector(src_gpot+dest_gpot),
+                data=1)
 
             man.connect(lpu_0_id, lpu_1_id, pat, 0, 1)
 
@@ -162,7 +175,7 @@ def main():
         screen = True
     logger = setup_logger(file_name=file_name, screen=screen)
 
-    random.seed(0)
+    rng = np.random.RandomState(0)
     c = not args.disconnect
     run(c)
 
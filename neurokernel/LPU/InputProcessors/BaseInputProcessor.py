@@ -7,7 +7,7 @@ from pycuda.tools import dtype_to_ctype
 import pycuda.elementwise as elementwise
 
 class BaseInputProcessor(object):
-    def __init__(self, var_list, mode=0):
+    def __init__(self, var_list, mode=0, pinned=False):
         # var_list should be a list of (variable, uids)
         # If no uids is provided, the variable will be ignored
         # Invalid uids will be ignored
@@ -22,6 +22,8 @@ class BaseInputProcessor(object):
         # mode = 0 => provide zero input when no input is available
         # mode = 1 => persist with previous input if no input is available
         self.mode = mode
+        # pinned = True => stage inputs in page-locked host memory
+        self.pinned = pinned
         self.input_to_be_processed = True
         self.dtypes = {}
         self._d_input = {}
@@ -89,8 +91,12 @@ class BaseInputProcessor(object):
             self.dest_inds[var] = garray.to_gpu(np.array(inds,np.int32))
             self.dtypes[var] = v_dict['buffer'].dtype
             self._d_input[var] = garray.zeros(len(d['uids']),self.dtypes[var])
-            self.variables[var]['input'] = np.zeros(len(d['uids']),
-                                                    self.dtypes[var])
+            if self.pinned:
+                self.variables[var]['input'] = cuda.pagelocked_zeros(
+                    len(d['uids']), self.dtypes[var])
+            else:
+                self.variables[var]['input'] = np.zeros(len(d['uids']),
+                                                        self.dtypes[var])
         self.pre_run()
         
     def pre_run(self):
@@ -3,7 +3,7 @@ import numpy as np
 
 from BaseInputProcessor import BaseInputProcessor
 class FileInputProcessor(BaseInputProcessor):
-    def __init__(self, filename, mode=0):
+    def __init__(self, filename, mode=0, pinned=False):
         self.filename = filename
         h5file = h5py.File(self.filename, 'r')
         var_list = []
@@ -11,7 +11,7 @@ class FileInputProcessor(BaseInputProcessor):
             if not isinstance(g, h5py.Group): continue
             uids = g.get('uids')[()].tolist()
             var_list.append((var, uids))
-        super(FileInputProcessor, self).__init__(var_list, mode)
+        super(FileInputProcessor, self).__init__(var_list, mode, pinned)
         h5file.close()    
         
     def pre_run(self):
@@ -26,7 +26,8 @@ class FileInputProcessor(BaseInputProcessor):
     def update_input(self):
         for var, dset in self.dsets.iteritems():
             if self.pointer+1 == dset.shape[0]: self.end_of_file=True
-            self.variables[var]['input'] = dset[self.pointer,:]
+            # Copy into the existing (possibly page-locked) host buffer
+            self.variables[var]['input'][:] = dset[self.pointer,:]
             self.pointer += 1
         if self.end_of_file: self.h5file.close()
             
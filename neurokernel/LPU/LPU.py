@@ -17,6 +17,7 @@ import networkx as nx
 #import time
 
 import copy
+import inspect
 import itertools
 import numbers
 
@@ -886,6 +887,9 @@ class LPU(Module):
         #print self.LPU_id, "step 9:", time.time()-start
 
         self.components = {}
+        # Initial values are copied asynchronously on a single stream that
+        # is only synchronized once all components have been initialized
+        init_stream = cuda.Stream()
         # Instantiate components
         for model in self.models:
             if model in ['Port','Input']: continue
@@ -897,19 +901,27 @@ class LPU(Module):
                 shift = self.memory_manager.variables[var]['cumlen'][mind]
                 update_pointers[var] = int(buff.gpudata)+(buff.current*buff.ld+\
                                             shift)*buff.dtype.itemsize
-            self.components[model].pre_run(update_pointers)
+            # Components written against the old pre_run(update_pointers)
+            # signature copy on the default stream, which init_stream
+            # (a blocking stream) is ordered with
+            if 'st' in inspect.getargspec(self.components[model].pre_run).args:
+                self.components[model].pre_run(update_pointers, st=init_stream)
+            else:
+                self.components[model].pre_run(update_pointers)
             for var in self._comps[model]['updates']:
                 buff = self.memory_manager.get_buffer(var)
                 mind = self.memory_manager.variables[var]['models'].index(model)
                 shift = self.memory_manager.variables[var]['cumlen'][mind]
                 for j in range(buff.buffer_length):
                     if j is not buff.current:
-                        cuda.memcpy_dtod(
+                        cuda.memcpy_dtod_async(
                             int(buff.gpudata)+(j*buff.ld+\
                                                 shift)*buff.dtype.itemsize,
                             int(buff.gpudata)+(buff.current*buff.ld+\
                                                 shift)*buff.dtype.itemsize,
-                            buff.dtype.itemsize*self.model_num[self.models[model]])
+                            buff.dtype.itemsize*self.model_num[self.models[model]],
+                            stream=init_stream)
+        init_stream.synchronize()
         
         #print self.LPU_id, "step 10:", time.time()-start
         
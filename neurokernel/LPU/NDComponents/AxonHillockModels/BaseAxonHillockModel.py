@@ -1,6 +1,15 @@
 #!/usr/bin/env python
 
 from abc import ABCMeta, abstractmethod, abstractproperty
+from collections import OrderedDict
+
+import numpy as np
+
+import pycuda.gpuarray as garray
+from pycuda.tools import dtype_to_ctype, context_dependent_memoize
+import pycuda.driver as cuda
+from pycuda.compiler import SourceModule
+
 from neurokernel.LPU.NDComponents.NDComponent import NDComponent
 
 class BaseAxonHillockModel(NDComponent):
@@ -8,5 +17,137 @@ class BaseAxonHillockModel(NDComponent):
 
     accesses = ['I']
     updates = ['spike_state','V']
-    
-    
+    params = []
+    internals = OrderedDict([])
+
+    def __init__(self, params_dict, access_buffers, dt,
+                 debug=False, LPU_id=None, cuda_verbose=False):
+        if cuda_verbose:
+            self.compile_options = ['--ptxas-options=-v']
+        else:
+            self.compile_options = []
+
+        self.num_comps = params_dict[self.params[0]].size
+        self.params_dict = params_dict
+        self.access_buffers = access_buffers
+        self.debug = debug
+        self.LPU_id = LPU_id
+        self.dtype = params_dict[self.params[0]].dtype
+
+        # Derived classes may set ddt (in seconds) before calling this to
+        # integrate with several substeps per simulation step
+        self.dt = np.double(dt)
+        if not hasattr(self, 'ddt'):
+            self.ddt = self.dt
+        self.steps = np.int32(max(int(self.dt/self.ddt), 1))
+
+        # All internal states share one (len(internals), num_comps)
+        # allocation; internal_states holds a view of each row.
+        init = np.empty((len(self.internals), self.num_comps), self.dtype)
+        for i, c in enumerate(self.internals):
+            init[i] = self.internals[c]
+        self._internal_buf = garray.to_gpu(init)
+        self.internal_states = {
+            c: self._internal_buf[i] for i, c in enumerate(self.internals)}
+
+        self.inputs = {
+            k: garray.empty(self.num_comps, dtype = self.access_buffers[k].dtype)\
+            for k in self.accesses}
+
+        dtypes = self._build_dtypes(
+            self.dtype,
+            {k: self.params_dict[k].dtype for k in self.params},
+            {k: self.inputs[k].dtype for k in self.accesses})
+        self.update_func = self.get_update_func(dtypes)
+
+        # Everything passed to the update kernel except the update pointers
+        # is fixed for the lifetime of the component, so the scaled time
+        # step (in ms) and the device pointers are only assembled once.
+        self._dt_scaled = self.dtype.type(1000.*self.ddt)
+        self._args = tuple(
+            [self.inputs[k].gpudata for k in self.accesses]+\
+            [self.params_dict[k].gpudata for k in self.params]+\
+            [self.internal_states[k].gpudata for k in self.internals])
+        self._call = self.update_func.prepared_async_call
+        self._grid = self.update_func.grid
+        self._block = self.update_func.block
+
+    @classmethod
+    def _build_dtypes(cls, dtype, param_dtypes, input_dtypes):
+        """
+        Return the dtypes of the update kernel arguments.
+
+        Parameters and inputs take their dtypes from `param_dtypes` and
+        `input_dtypes`; internal states and updated variables use `dtype`,
+        except spike_state, which is int32.
+        """
+
+        dtypes = {'dt': dtype}
+        dtypes.update({k: input_dtypes[k] for k in cls.accesses})
+        dtypes.update({k: param_dtypes[k] for k in cls.params})
+        dtypes.update({k: dtype for k in cls.internals})
+        dtypes.update({k: dtype if not k == 'spike_state' else np.int32 for k in cls.updates})
+        return dtypes
+
+    def pre_run(self, update_pointers, st=None):
+        self.add_initializer('initV', 'V', update_pointers, st=st)
+        self.add_initializer('initV', 'internalV', update_pointers, st=st)
+
+    def add_initializer(self, var_a, var_b, update_pointers, st=None):
+        """
+        Asynchronously copy parameter `var_a` into the updated variable or
+        internal state `var_b` on stream `st` if `var_a` is specified.
+        """
+
+        if not var_a in self.params_dict:
+            return
+        src = self.params_dict[var_a]
+        if var_b in self.internal_states:
+            cuda.memcpy_dtod_async(self.internal_states[var_b].gpudata,
+                                   src.gpudata, src.nbytes, stream=st)
+        if var_b in update_pointers:
+            cuda.memcpy_dtod_async(int(update_pointers[var_b]),
+                                   src.gpudata, src.nbytes, stream=st)
+
+    def run_step(self, update_pointers, st=None):
+        self.sum_all_inputs(st=st)
+
+        self._call(self._grid, self._block, st,
+                   self.num_comps, self._dt_scaled, self.steps,
+                   *(self._args+tuple([update_pointers[k] for k in self.updates])))
+
+    # Should be implemented by child class
+    def get_update_template(self):
+        raise NotImplementedError
+
+    def get_update_func(self, dtypes):
+        type_dict = {k: dtype_to_ctype(dtypes[k]) for k in dtypes}
+        type_dict.update({'fletter': 'f' if type_dict['dt'] == 'float' else ''})
+        # Compiled modules are shared between instances with identical
+        # source and options; each instance gets its own function object so
+        # that block and grid remain per instance.
+        mod = get_update_module(self.get_update_template() % type_dict,
+                                tuple(self.compile_options))
+        func = mod.get_function("update")
+        func.prepare('i'+np.dtype(dtypes['dt']).char+'i'+'P'*(len(dtypes)-1))
+
+        # Spread the components over at least one block per multiprocessor,
+        # using blocks of at least 128 threads; the update kernels loop
+        # over components with a grid stride, so any grid size is valid.
+        # MAX_THREADS_PER_BLOCK of the function already accounts for the
+        # registers the compiled kernel uses.
+        dev = cuda.Context.get_device()
+        num_sms = dev.MULTIPROCESSOR_COUNT
+        max_threads = func.get_attribute(
+            cuda.function_attribute.MAX_THREADS_PER_BLOCK)
+        max_threads = max(32, max_threads // 32 * 32)
+        per_sm = ((self.num_comps-1) // num_sms + 1 + 31) // 32 * 32
+        block_size = min(max_threads, max(128, per_sm))
+        func.block = (block_size,1,1)
+        func.grid = (min(32 * num_sms,
+                         (self.num_comps-1) // block_size + 1), 1)
+        return func
+
+@context_dependent_memoize
+def get_update_module(source, options):
+    return SourceModule(source, options=list(options))
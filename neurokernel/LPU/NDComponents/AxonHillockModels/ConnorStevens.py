@@ -14,91 +14,42 @@ class ConnorStevens(BaseAxonHillockModel):
     updates = ['spike_state', 'V']
     accesses = ['I']
     params = ['n','m','h','a','b']
-    internals = OrderedDict([('internalV',-65.),('internalVprev1',-65.),('internalVprev2',-65.)])
+    internals = OrderedDict([('internalV',-65.),('internalVprev2',-65.)])
 
     def __init__(self, params_dict, access_buffers, dt,
                  debug=False, LPU_id=None, cuda_verbose=True):
-        if cuda_verbose:
-            self.compile_options = ['--ptxas-options=-v']
-        else:
-            self.compile_options = []
-
-        self.num_comps = params_dict['n'].size
-        self.params_dict = params_dict
-        self.access_buffers = access_buffers
+        self.ddt = np.double(1e-6)
+        super(ConnorStevens, self).__init__(params_dict, access_buffers, dt,
+                                            debug=debug, LPU_id=LPU_id,
+                                            cuda_verbose=cuda_verbose)
 
-        self.debug = debug
-        self.LPU_id = LPU_id
-        self.dtype = params_dict['n'].dtype
+    def pre_run(self, update_pointers, st=None):
+        for var in ['V', 'internalV', 'internalVprev2']:
+            self.add_initializer('initV', var, update_pointers, st=st)
 
-        self.dt = np.double(dt)
-        self.ddt = np.double(1e-6)
-        self.steps = np.int32(max( int(self.dt/self.ddt), 1 ))
-
-        self.internal_states = {
-            c: garray.zeros(self.num_comps, dtype = self.dtype)+self.internals[c] \
-            for c in self.internals}
-
-        self.inputs = {
-            k: garray.empty(self.num_comps, dtype = self.access_buffers[k].dtype)\
-            for k in self.accesses}
-
-        dtypes = {'dt': self.dtype}
-        dtypes.update({k: self.inputs[k].dtype for k in self.accesses})
-        dtypes.update({k: self.params_dict[k].dtype for k in self.params})
-        dtypes.update({k: self.internal_states[k].dtype for k in self.internals})
-        dtypes.update({k: self.dtype if not k == 'spike_state' else np.int32 for k in self.updates})
-        self.update_func = self.get_update_func(dtypes)
-
-    def pre_run(self, update_pointers):
-        if self.params_dict.has_key('initV'):
-            cuda.memcpy_dtod(int(update_pointers['V']),
-                             self.params_dict['initV'].gpudata,
-                             self.params_dict['initV'].nbytes)
-            cuda.memcpy_dtod(self.internal_states['internalV'].gpudata,
-                             self.params_dict['initV'].gpudata,
-                             self.params_dict['initV'].nbytes)
-            cuda.memcpy_dtod(self.internal_states['internalVprev1'].gpudata,
-                             self.params_dict['initV'].gpudata,
-                             self.params_dict['initV'].nbytes)
-            cuda.memcpy_dtod(self.internal_states['internalVprev2'].gpudata,
-                             self.params_dict['initV'].gpudata,
-                             self.params_dict['initV'].nbytes)
-
-
-    def run_step(self, update_pointers, st=None):
-        for k in self.inputs:
-            self.sum_in_variable(k, self.inputs[k], st=st)
-
-        self.update_func.prepared_async_call(
-            self.update_func.grid, self.update_func.block, st,
-            self.num_comps, self.ddt, self.steps,
-            *[self.inputs[k].gpudata for k in self.accesses]+\
-            [self.params_dict[k].gpudata for k in self.params]+\
-            [self.internal_states[k].gpudata for k in self.internals]+\
-            [update_pointers[k] for k in self.updates])
 
     def get_update_template(self):
         template = """
 #define EXP exp%(fletter)s
 #define POW pow%(fletter)s
-
-#define		E_K		-72.
-#define		E_Na		55.
-#define		E_a		-75.
-#define		E_l		-17.
-#define		G_total		67.7
-#define		G_a		47.7
-#define		G_Na		120.
+#define FMA fma%(fletter)s
+
+#define		E_K		-72.%(fletter)s
+#define		E_Na		55.%(fletter)s
+#define		E_a		-75.%(fletter)s
+#define		E_l		-17.%(fletter)s
+#define		G_total		67.7%(fletter)s
+#define		G_a		47.7%(fletter)s
+#define		G_Na		120.%(fletter)s
 #define		G_K		(G_total-G_a)
-#define		G_l		0.3
-#define		ms		-5.3
-#define		hs		-12.
-#define		ns		-4.3
+#define		G_l		0.3%(fletter)s
+#define		ms		-5.3%(fletter)s
+#define		hs		-12.%(fletter)s
+#define		ns		-4.3%(fletter)s
 
 __global__ void update(
     int num_comps,
-    %(dt)s dt,
+    %(dt)s ddt,
     int nsteps,
     %(I)s* g_I,
     %(n)s* g_n,
@@ -107,7 +58,6 @@ __global__ void update(
     %(a)s* g_a,
     %(b)s* g_b,
     %(internalV)s* g_internalV,
-    %(internalVprev1)s* g_internalVprev1,
     %(internalVprev2)s* g_internalVprev2,
     %(spike_state)s* g_spike_state,
     %(V)s* g_V)
@@ -115,11 +65,9 @@ __global__ void update(
 	int tid = threadIdx.x + blockIdx.x * blockDim.x;
     int total_threads = gridDim.x * blockDim.x;
 
-    %(dt)s ddt = dt*1000.; // s to ms
-
-    %(V)s V, Vprev1, Vprev2;
+    %(V)s V, Vprev1, Vprev2, dV;
     %(I)s I;
-    %(spike_state)s spike;
+    unsigned int spike;
 
     %(n)s n, a_n, b_n, n_inf, tau_n;
     %(m)s m, a_m, b_m, m_inf, tau_m;
@@ -130,7 +78,7 @@ __global__ void update(
 
     for(int i = tid; i < num_comps; i += total_threads)
     {
-        spike = 0;
+        spike = 0u;
         I = g_I[i];
         n = g_n[i];
         m = g_m[i];
@@ -138,42 +86,55 @@ __global__ void update(
         a = g_a[i];
         b = g_b[i];
         V = g_internalV[i];
-        Vprev1 = g_internalVprev1[i];
+        // the last substep always leaves Vprev1 equal to V
+        Vprev1 = V;
         Vprev2 = g_internalVprev2[i];
 
+        // the voltage history lives in registers; unrolling lets the
+        // compiler interleave the gating computations of consecutive
+        // substeps
+        #pragma unroll 4
         for (int j = 0; j < nsteps; ++j)
         {
             /*
              * Hodgkin-Huxley with shifts - 3.8 is temperature factor
              */
-            a_m = -.1*(V+35+ms)/(EXP(-(V+35+ms)/10)-1);
+            a_m = -.1%(fletter)s*(V+35+ms)/(EXP(-(V+35+ms)/10)-1);
             b_m = 4*EXP(-(V+60+ms)/18);
             m_inf = a_m/(a_m+b_m);
-            tau_m = 1/(3.8*(a_m+b_m));
+            tau_m = 1/(3.8%(fletter)s*(a_m+b_m));
 
-            a_h = .07*EXP(-(V+60+hs)/20);
+            a_h = .07%(fletter)s*EXP(-(V+60+hs)/20);
             b_h = 1/(1+EXP(-(V+30+hs)/10));
             h_inf = a_h/(a_h+b_h);
-            tau_h = 1/(3.8*(a_h+b_h));
+            tau_h = 1/(3.8%(fletter)s*(a_h+b_h));
 
-            a_n = -.01*(V+50+ns)/(EXP(-(V+50+ns)/10)-1);
-            b_n = .125*EXP(-(V+60+ns)/80);
+            a_n = -.01%(fletter)s*(V+50+ns)/(EXP(-(V+50+ns)/10)-1);
+            b_n = .125%(fletter)s*EXP(-(V+60+ns)/80);
             n_inf = a_n/(a_n+b_n);
-            tau_n = 2/(3.8*(a_n+b_n));
-
-            a_inf = POW(.0761*EXP((V+94.22)/31.84)/(1+EXP((V+1.17)/28.93)),.3333);
-            tau_a = .3632+1.158/(1+EXP((V+55.96)/20.12));
-            b_inf = POW(1/(1+EXP((V+53.3)/14.54)),4);
-            tau_b = 1.24+2.678/(1+EXP((V+50)/16.027));
-
-            V += ddt*(I-G_l*(V-E_l)-G_Na*h*m*m*m*(V-E_Na)-G_K*n*n*n*n*(V-E_K)-G_a*b*a*a*a*(V-E_a));
-            m += ddt*(m_inf-m)/tau_m;
-            h += ddt*(h_inf-h)/tau_h;
-            n += ddt*(n_inf-n)/tau_n;
-            a += ddt*(a_inf-a)/tau_a;
-            b += ddt*(b_inf-b)/tau_b;
-
-            spike += (Vprev2<=Vprev1) && (Vprev1 >= V) && (Vprev1 > -30);
+            tau_n = 2/(3.8%(fletter)s*(a_n+b_n));
+
+            a_inf = POW(.0761%(fletter)s*EXP((V+94.22%(fletter)s)/31.84%(fletter)s)/(1+EXP((V+1.17%(fletter)s)/28.93%(fletter)s)),.3333%(fletter)s);
+            tau_a = .3632%(fletter)s+1.158%(fletter)s/(1+EXP((V+55.96%(fletter)s)/20.12%(fletter)s));
+            b_inf = POW(1/(1+EXP((V+53.3%(fletter)s)/14.54%(fletter)s)),4);
+            tau_b = 1.24%(fletter)s+2.678%(fletter)s/(1+EXP((V+50)/16.027%(fletter)s));
+
+            // accumulate the membrane current as a chain of fused
+            // multiply-adds
+            dV = FMA(-G_l, V-E_l, I);
+            dV = FMA(-G_Na*h*m*m*m, V-E_Na, dV);
+            dV = FMA(-G_K*n*n*n*n, V-E_K, dV);
+            dV = FMA(-G_a*b*a*a*a, V-E_a, dV);
+
+            V = FMA(ddt, dV, V);
+            m = FMA(ddt, (m_inf-m)/tau_m, m);
+            h = FMA(ddt, (h_inf-h)/tau_h, h);
+            n = FMA(ddt, (n_inf-n)/tau_n, n);
+            a = FMA(ddt, (a_inf-a)/tau_a, a);
+            b = FMA(ddt, (b_inf-b)/tau_b, b);
+
+            // non-short-circuiting & keeps the detection branchless
+            spike |= (unsigned int)((Vprev2<=Vprev1) & (Vprev1 >= V) & (Vprev1 > -30));
 
             Vprev2 = Vprev1;
             Vprev1 = V;
@@ -186,26 +147,13 @@ __global__ void update(
         g_b[i] = b;
         g_V[i] = V;
         g_internalV[i] = V;
-        g_internalVprev1[i] = Vprev1;
         g_internalVprev2[i] = Vprev2;
-        g_spike_state[i] = (spike > 0);
+        g_spike_state[i] = (%(spike_state)s)spike;
     }
 }
 """
         return template
 
-    def get_update_func(self, dtypes):
-        type_dict = {k: dtype_to_ctype(dtypes[k]) for k in dtypes}
-        type_dict.update({'fletter': 'f' if type_dict['n'] == 'float' else ''})
-        mod = SourceModule(self.get_update_template() % type_dict,
-                           options=self.compile_options)
-        func = mod.get_function("update")
-        func.prepare('i'+np.dtype(dtypes['dt']).char+'i'+'P'*(len(type_dict)-2))
-        func.block = (128,1,1)
-        func.grid = (min(6 * cuda.Context.get_device().MULTIPROCESSOR_COUNT,
-                         (self.num_comps-1) / 128 + 1), 1)
-        return func
-
 
 
 if __name__ == '__main__':
@@ -266,9 +214,12 @@ if __name__ == '__main__':
     fl_input_processor = StepInputProcessor('I', ['neuron0'], 40, 0.15, 0.25)
     fl_output_processor = FileOutputProcessor([('spike_state', None),('V', None)], 'new_output.h5', sample_interval=1)
 
+    # The model is well conditioned in single precision, which halves the
+    # memory traffic of the state variables
     man.add(LPU, 'ge', dt, comp_dict, conns,
             device=args.gpu_dev, input_processors = [fl_input_processor],
-            output_processors = [fl_output_processor], debug=args.debug)
+            output_processors = [fl_output_processor], debug=args.debug,
+            default_dtype=np.float32)
 
     man.spawn()
     man.start(steps=args.steps)
@@ -293,7 +244,13 @@ if __name__ == '__main__':
     plt.ylim([-70, 60])
     plt.grid()
     plt.subplot(212)
-    spk = f['spike_state/data'].value.flatten().nonzero()[0]
+    # Read spike_state in chunks of rows rather than loading it at once;
+    # only the flat indices of the (sparse) spikes are kept
+    ds = f['spike_state/data']
+    chunk_rows = 4096
+    spk = np.concatenate(
+        [np.flatnonzero(ds[i:i+chunk_rows])+i*ds.shape[1]
+         for i in range(0, ds.shape[0], chunk_rows)] or [np.zeros(0, int)])
     plt.stem(t[spk],np.ones((len(spk),)))
     plt.xlabel('time, [s]')
     plt.ylabel('Spike')
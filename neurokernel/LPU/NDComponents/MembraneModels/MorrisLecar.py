@@ -47,22 +47,21 @@ class MorrisLecar(BaseMembraneModel):
         dtypes.update({k: self.dtype if not k == 'spike_state' else np.int32 for k in self.updates})
         self.update_func = self.get_update_func(dtypes)
 
-    def pre_run(self, update_pointers):
+    def pre_run(self, update_pointers, st=None):
         #initializing
-        cuda.memcpy_dtod(int(update_pointers['V']),
-                         self.params_dict['initV'].gpudata,
-                         self.params_dict['initV'].nbytes)
-        cuda.memcpy_dtod(self.internal_states['internalV'].gpudata,
-                         self.params_dict['initV'].gpudata,
-                         self.params_dict['initV'].nbytes)
-        cuda.memcpy_dtod(self.internal_states['n'].gpudata,
-                         self.params_dict['initn'].gpudata,
-                         self.params_dict['initn'].nbytes)
+        cuda.memcpy_dtod_async(int(update_pointers['V']),
+                               self.params_dict['initV'].gpudata,
+                               self.params_dict['initV'].nbytes, stream=st)
+        cuda.memcpy_dtod_async(self.internal_states['internalV'].gpudata,
+                               self.params_dict['initV'].gpudata,
+                               self.params_dict['initV'].nbytes, stream=st)
+        cuda.memcpy_dtod_async(self.internal_states['n'].gpudata,
+                               self.params_dict['initn'].gpudata,
+                               self.params_dict['initn'].nbytes, stream=st)
 
 
     def run_step(self, update_pointers, st=None):
-        for k in self.inputs:
-            self.sum_in_variable(k, self.inputs[k], st=st)
+        self.sum_all_inputs(st=st)
 
         self.update_func.prepared_async_call(
             self.update_func.grid, self.update_func.block, st,
@@ -29,7 +29,16 @@ class NDComponent(object):
         pass
 
 
-    def pre_run(self, update_pointers):
+    def pre_run(self, update_pointers, st=None):
+        '''
+        This method will be called before the simulation starts. Copies
+        issued here should be enqueued on stream `st`; the caller
+        synchronizes it once all components are initialized.
+
+        The `st` argument is optional for subclasses: the LPU only passes it
+        if the overriding method accepts it, and calls pre_run(update_pointers)
+        otherwise.
+        '''
         pass
 
     def post_run(self):
@@ -38,22 +47,47 @@ class NDComponent(object):
         '''
         pass
 
+    def sum_all_inputs(self, st=None):
+        '''
+        Sum the incoming values of every variable in self.inputs.
+        '''
+        for var, garr in self.inputs.items():
+            self.sum_in_variable(var, garr, st=st)
+
     def sum_in_variable(self, var, garr, st=None):
         try:
             a = self.sum_kernel
         except AttributeError:
             self.sum_kernel = self.__get_sum_kernel(garr.size, garr.dtype)
+        buff = self.access_buffers[var]
         self.sum_kernel.prepared_async_call(
             self.__grid_sum, self.__block_sum, st,
-            garr.gpudata,                                          #P
-            self.params_dict['conn_data'][var]['delay'].gpudata,   #P
-            self.params_dict['cumpre'][var].gpudata,               #P
-            self.params_dict['npre'][var].gpudata,                 #P
-            self.params_dict['pre'][var].gpudata,                  #P
-            self.access_buffers[var].gpudata,                      #P
-            self.access_buffers[var].ld,                           #i
-            self.access_buffers[var].current,                      #i
-            self.access_buffers[var].buffer_length)                #i
+            *(self.__get_sum_args(var, garr)+\
+              (buff.current, buff.buffer_length)))                 #ii
+
+    def __get_sum_args(self, var, garr):
+        '''
+        Return the arguments of the summation kernel that do not change
+        during the simulation, i.e. all but the current position and the
+        length of the access buffer.
+        '''
+        try:
+            cache = self.__sum_args
+        except AttributeError:
+            cache = self.__sum_args = {}
+        key = (var, int(garr.gpudata))
+        try:
+            return cache[key]
+        except KeyError:
+            args = (garr.gpudata,                                          #P
+                    self.params_dict['conn_data'][var]['delay'].gpudata,   #P
+                    self.params_dict['cumpre'][var].gpudata,               #P
+                    self.params_dict['npre'][var].gpudata,                 #P
+                    self.params_dict['pre'][var].gpudata,                  #P
+                    self.access_buffers[var].gpudata,                      #P
+                    self.access_buffers[var].ld)                           #i
+            cache[key] = args
+            return args
 
     def __get_sum_kernel(self, num_comps, dtype=np.double):
         template = """
@@ -1,3 +1,4 @@
+import pycuda.driver as cuda
 import pycuda.gpuarray as garray
 import numpy as np
 from neurokernel.LPU.LPU import LPU
@@ -5,7 +6,7 @@ from pycuda.tools import dtype_to_ctype, context_dependent_memoize
 import pycuda.elementwise as elementwise
 
 class BaseOutputProcessor(object):
-    def __init__(self, var_list, sample_interval=1):
+    def __init__(self, var_list, sample_interval=1, pinned=False):
         # var_list should be a list of (variable, uids)
         # Invalid uids will be ignored
         # if uids is None, the entire variable will be outputted
@@ -17,6 +18,8 @@ class BaseOutputProcessor(object):
         self.variables = {var:{'uids':uids,'output':None}
                           for var, uids in var_list}
         self.sample_interval = sample_interval
+        # pinned = True => receive outputs in page-locked host memory
+        self.pinned = pinned
         self.epoch = 0
         self.src_inds = {}
         self._LPU_obj = None
@@ -47,7 +50,11 @@ class BaseOutputProcessor(object):
                                           buff.dtype.itemsize)
             
                 self.get_inds(src_mem, self._d_output[var],self.src_inds[var])
-                d['output'] = self._d_output[var].get()
+                if self.pinned:
+                    # Reuse the page-locked buffer allocated in _pre_run
+                    self._d_output[var].get(d['output'])
+                else:
+                    d['output'] = self._d_output[var].get()
             self.process_output()
 
     def _pre_run(self):
@@ -77,7 +84,11 @@ class BaseOutputProcessor(object):
                 d['uids'] = [uids[i] for i in o]
             self._d_output[var] = garray.empty(len(d['uids']),
                                                v_dict['buffer'].dtype)
-            d['output']=np.zeros(len(d['uids']), v_dict['buffer'].dtype)
+            if self.pinned:
+                d['output'] = cuda.pagelocked_zeros(len(d['uids']),
+                                                    v_dict['buffer'].dtype)
+            else:
+                d['output'] = np.zeros(len(d['uids']), v_dict['buffer'].dtype)
         self.pre_run()
 
     # Should be implemented by child class
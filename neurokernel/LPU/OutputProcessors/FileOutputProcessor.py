@@ -3,9 +3,10 @@ import h5py
 from datetime import datetime
 from neurokernel.LPU.OutputProcessors.BaseOutputProcessor import BaseOutputProcessor
 class FileOutputProcessor(BaseOutputProcessor):
-    def __init__(self, var_list, filename, sample_interval=1):
+    def __init__(self, var_list, filename, sample_interval=1, pinned=False):
         self.fname = filename
-        super(FileOutputProcessor, self).__init__(var_list, sample_interval)
+        super(FileOutputProcessor, self).__init__(var_list, sample_interval,
+                                                  pinned)
     
     def pre_run(self):
         self.h5file = h5py.File(self.fname, 'w')
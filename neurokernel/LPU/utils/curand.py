@@ -1,4 +1,5 @@
 from pycuda.compiler import SourceModule
+from pycuda.tools import context_dependent_memoize
 import pycuda.gpuarray as garray
 import numpy as np
 
@@ -7,6 +8,10 @@ size_of_curandStateXORWOW = 12
 def curand_setup(num_threads, seed):
     """
     Setup curand seed
+
+    curand_init is expensive, so it is only run here, once per thread;
+    kernels drawing random numbers should load their curandStateXORWOW_t
+    from the returned array and store it back after sampling.
     """
     func = get_curand_int_func()
     grid = ( (int(num_threads)-1)/128 + 1,1)
@@ -19,6 +24,7 @@ def curand_setup(num_threads, seed):
     return state
 
 
+@context_dependent_memoize
 def get_curand_int_func():
     code = """
 #include "curand_kernel.h"